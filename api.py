@@ -1,17 +1,46 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from src.config import TARGET_HORIZONS
 from src.data_loader import load_csv
-from src.features import (
-    add_technical_indicators,
-    add_temporal_features,
-    add_lagged_features,
-    add_return_features,
-    add_custom_features,
-)
+from src.features import prepare_features as build_features
 from src.predictor import ModelPredictor
+from src.profiler import ProfileRateLimiter, maybe_profile
+from src.retrainer import BackgroundRetrainer
 import pandas as pd
 
-app = FastAPI()
+# Configuration
+CSV_PATH = "data/gold_data_last_90.csv"
+
+# Réentraînement en arrière-plan (opt-in) : QUANTIA_BACKGROUND_RETRAINING=1
+BACKGROUND_RETRAINING = os.environ.get("QUANTIA_BACKGROUND_RETRAINING", "0") == "1"
+retrainer = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global retrainer
+    if BACKGROUND_RETRAINING:
+        retrainer = BackgroundRetrainer(
+            csv_path=CSV_PATH,
+            predictor=ModelPredictor(target_horizons=TARGET_HORIZONS),
+        )
+        if not retrainer.start():
+            # Un autre worker réentraîne déjà : on lit les modèles qu'il sauvegarde sur disque
+            retrainer = None
+    yield
+    if retrainer is not None:
+        retrainer.stop(timeout=5)  # Thread daemon : ne pas bloquer l'arrêt sur un rebuild
+
+app = FastAPI(lifespan=lifespan)
+
+# Mode multi-workers (opt-in) : QUANTIA_SHARED_FEATURES=1, les features sont lues en mémoire partagée
+# depuis le processus lancé avec `python api.py --publish-features`
+SHARED_FEATURES = os.environ.get("QUANTIA_SHARED_FEATURES", "0") == "1"
+feature_reader = None
+if SHARED_FEATURES:
+    from src.shared_features import SharedFeatureReader  # Importé seulement en mode partagé (POSIX)
+    feature_reader = SharedFeatureReader()
 
 # Autoriser les appels frontend (CORS)
 app.add_middleware(
@@ -22,18 +51,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configuration
-CSV_PATH = "data/gold_data_last_90.csv"
-TARGET_HORIZONS = [1, 2, 3]
-FEATURE_COLUMNS = ['open', 'high', 'low', 'close']
-LAGS = [1, 2, 3]
+# Profilage à la demande (opt-in) : QUANTIA_PROFILING=1, puis header "X-Profile: 1" ou "?profile=1",
+# limité en fréquence et en nombre de fichiers conservés
+PROFILING = os.environ.get("QUANTIA_PROFILING", "0") == "1"
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+profile_limiter = ProfileRateLimiter()
+
+def profile_requested(request: Request) -> bool:
+    if not PROFILING:
+        return False
+    flag = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+    return flag is not None and flag.lower() in ("1", "true", "yes")
 
 def prepare_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = add_technical_indicators(df)
-    df = add_temporal_features(df)
-    df = add_lagged_features(df, columns=FEATURE_COLUMNS, lags=LAGS)
-    df = add_return_features(df)
-    df = add_custom_features(df)
+    df = build_features(df)  # Même pipeline que l'entraînement (src/features.py)
     df.ffill(inplace=True)  # Corrige les FutureWarning
     df.bfill(inplace=True)
     return df
@@ -42,20 +74,36 @@ def prepare_features(df: pd.DataFrame) -> pd.DataFrame:
 def root():
     return {"message": "Quantia ML API is up."}
 
-@app.get("/predict")
-def get_latest_prediction():
-    # Charger les données, générer les features et faire la prédiction
-    df = load_csv(CSV_PATH)
-    df = prepare_features(df)
-    latest = df.iloc[[-1]]
+def predict_latest() -> dict:
+    if feature_reader is not None:
+        # Dernière ligne publiée par le processus de features, sans copie de la matrice
+        latest = feature_reader.latest()
+    else:
+        # Charger les données, générer les features et faire la prédiction
+        df = load_csv(CSV_PATH)
+        df = prepare_features(df)
+        latest = df.iloc[[-1]]
+
+        # Drop the date column before prediction as XGBoost doesn't support datetime type
+        if 'date' in latest.columns:
+            latest = latest.drop(columns=['date'])
 
-    # Drop the date column before prediction as XGBoost doesn't support datetime type
-    if 'date' in latest.columns:
-        latest = latest.drop(columns=['date'])
+    if retrainer is not None and retrainer.predictor.models:
+        # Modèles gardés en mémoire et remplacés atomiquement par le retrainer
+        predictor = retrainer.predictor
+    else:
+        predictor = ModelPredictor(target_horizons=TARGET_HORIZONS)
+        predictor.load_models()
+    return predictor.predict(latest)
 
-    predictor = ModelPredictor(target_horizons=TARGET_HORIZONS)
-    predictor.load_models()
-    result = predictor.predict(latest)
+@app.get("/predict")
+def get_latest_prediction(request: Request, response: Response):
+    with maybe_profile(profile_limiter, "predict", enabled=profile_requested(request)) as profile:
+        result = predict_latest()
+
+    if profile.output_path:
+        # Nom de fichier seulement (dans PROFILES_PATH), jamais le chemin du serveur
+        response.headers["X-Profile-Output"] = os.path.basename(profile.output_path)
 
     # Convert numpy.float32 values to Python native float types for JSON serialization
     serializable_result = {k: float(v) for k, v in result.items()}
@@ -63,5 +111,18 @@ def get_latest_prediction():
     return serializable_result
 
 if __name__ == "__main__":
+    import argparse
     import uvicorn
-    uvicorn.run("api:app", host="127.0.0.1", port=8000, reload=True)
+
+    parser = argparse.ArgumentParser(description="Quantia ML API")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of uvicorn workers (run with QUANTIA_SHARED_FEATURES=1 to share features)")
+    parser.add_argument("--publish-features", action="store_true",
+                        help="Run the loader/feature process that publishes features to shared memory")
+    args = parser.parse_args()
+
+    if args.publish_features:
+        from src.shared_features import run_publisher
+        run_publisher(CSV_PATH, prepare_features)
+    else:
+        uvicorn.run("api:app", host="127.0.0.1", port=8000, reload=args.workers == 1, workers=args.workers)
@@ -0,0 +1,74 @@
+"""
+Benchmark: cost of `validate_ohlc` relative to reading the CSV.
+
+Writes a synthetic minute-bar OHLC CSV with injected duplicates, out-of-order rows,
+missing bars and inconsistent candles, then times each validation/repair
+configuration against `pd.read_csv` alone and against the previous loader
+(`read_csv` followed by `sort_values`), whose sort validation replaces.
+
+Usage:
+    python -m benchmarks.data_loader_benchmark --rows 10000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import validate_ohlc
+
+CONFIGS = {
+    "report only": dict(duplicates='report', order='report', ohlc='report', gaps='report'),
+    "defaults": dict(),
+    "full repair": dict(ohlc='clip', gaps='ffill'),
+}
+
+
+def _synthetic_csv(path: str, rows: int, issue_rate: float):
+    rng = np.random.default_rng(42)
+    close = 2000 + np.cumsum(rng.standard_normal(rows))
+    open_ = close + rng.standard_normal(rows) * 0.5
+    high = np.maximum(open_, close) + rng.random(rows)
+    low = np.minimum(open_, close) - rng.random(rows)
+    date = np.datetime64('2020-01-01T00:00') + np.arange(rows).astype('timedelta64[m]')
+    df = pd.DataFrame({'date': date, 'open': open_, 'high': high, 'low': low, 'close': close})
+
+    n_issues = int(rows * issue_rate)
+    df = df.drop(index=rng.choice(rows, n_issues, replace=False))  # Missing bars
+    df = pd.concat([df, df.sample(n_issues, random_state=1)])  # Duplicates, appended out of order
+    bad = df.sample(n_issues, random_state=2).index
+    df.loc[bad, 'high'] = df.loc[bad, 'low'] - 1  # high < low
+    df.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--issue-rate", type=float, default=0.001)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ohlc.csv")
+        _synthetic_csv(path, args.rows, args.issue_rate)
+
+        start = time.perf_counter()
+        raw = pd.read_csv(path, parse_dates=['date'])
+        load_s = time.perf_counter() - start
+        start = time.perf_counter()
+        raw.sort_values('date')
+        sort_s = time.perf_counter() - start
+        print(f"read_csv: {len(raw)} rows in {load_s:.2f}s, previous sort_values: {sort_s:.3f}s\n")
+
+        for name, policies in CONFIGS.items():
+            start = time.perf_counter()
+            _, report = validate_ohlc(raw, **policies)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<12} {elapsed:6.3f}s ({100 * elapsed / load_s:4.1f}% of read_csv, "
+                  f"{100 * (elapsed - sort_s) / (load_s + sort_s):+5.1f}% vs previous loader)  {report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: memory per worker and /predict throughput, private vs shared features.
+
+Each worker runs the real request path, `api.predict_latest()`:
+    - private: load_csv + prepare_features + model load + predict on every request,
+      which is what every uvicorn worker does today;
+    - shared: read the latest row from the shared-memory matrix + model load + predict.
+The worker count is scaled from 1 up to --max-workers.
+
+Throughput only scales with workers up to the number of physical cores, so run it
+on a machine with at least --max-workers cores; the core count is printed with the
+results. Requires the full serving environment (TA-Lib, XGBoost, trained models in
+models/ and the CSV), and Linux for /proc/self/smaps_rollup.
+
+Memory: RSS counts shared pages in full in every process, PSS splits them between
+the processes mapping them, so the sum of PSS is the real footprint.
+
+Usage:
+    python -m benchmarks.shared_features_benchmark --csv data/gold_data_last_90.csv --duration 10
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+import api
+from src.data_loader import load_csv
+from src.shared_features import SharedFeaturePublisher, SharedFeatureReader
+
+BENCH_NAME = "quantia_features_bench"
+
+
+def _memory_kb() -> Dict[str, int]:
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def _worker(mode: str, csv_path: str, duration: float, start, results):
+    api.CSV_PATH = csv_path
+    if mode == "shared":
+        reader = SharedFeatureReader(BENCH_NAME)
+        reader.refresh()
+        reader.matrix.sum()  # Touch every page so PSS reflects the whole shared matrix
+        api.feature_reader = reader
+    else:
+        api.feature_reader = None
+    api.predict_latest()  # Warm-up request, so memory includes one full request
+    memory = _memory_kb()
+
+    start.wait()
+    requests = 0
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        api.predict_latest()
+        latencies.append(time.perf_counter() - t0)
+        requests += 1
+    results.put({
+        "rss_mb": memory["rss"] / 1024,
+        "pss_mb": memory["pss"] / 1024,
+        "requests": requests,
+        "p50_ms": 1000 * float(np.median(latencies)),
+    })
+
+
+def run(mode: str, workers: int, csv_path: str, duration: float) -> Dict[str, float]:
+    ctx = mp.get_context("spawn")  # No copy-on-write sharing inherited from the parent
+    start = ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, csv_path, duration, start, results))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    start.wait()
+    stats: List[Dict[str, float]] = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return {
+        "rss_mb": float(np.mean([s["rss_mb"] for s in stats])),
+        "pss_mb": float(np.mean([s["pss_mb"] for s in stats])),
+        "total_pss_mb": float(np.sum([s["pss_mb"] for s in stats])),
+        "p50_ms": float(np.mean([s["p50_ms"] for s in stats])),
+        "req_per_s": sum(s["requests"] for s in stats) / duration,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--csv", default=api.CSV_PATH, help="Candle CSV (use a large one to see memory effects)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of requests per run")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    cores = os.cpu_count()
+    counts = sorted({1, *[2 ** i for i in range(1, args.max_workers.bit_length())], args.max_workers})
+    print(f"CPU cores: {cores}, workers: {counts}")
+    if args.max_workers > cores:
+        print(f"⚠️ More workers than cores: throughput beyond {cores} workers measures contention, not scaling")
+
+    publisher = SharedFeaturePublisher(BENCH_NAME)
+    try:
+        features = api.prepare_features(load_csv(args.csv))
+        publisher.publish(features)
+        print(f"Feature matrix: {features.shape[0]} x {features.shape[1]}\n")
+        print(f"{'mode':<8} {'workers':>7} {'RSS/worker':>11} {'PSS/worker':>11} "
+              f"{'total PSS':>10} {'p50':>9} {'req/s':>9}")
+        for mode in ("private", "shared"):
+            for workers in counts:
+                r = run(mode, workers, args.csv, args.duration)
+                print(f"{mode:<8} {workers:>7} {r['rss_mb']:>9.1f}MB {r['pss_mb']:>9.1f}MB "
+                      f"{r['total_pss_mb']:>8.1f}MB {r['p50_ms']:>7.2f}ms {r['req_per_s']:>9.1f}")
+    finally:
+        publisher.close(unlink_control=True)  # The benchmark's segments are not reused
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,19 @@
-import pandas as pd
+import argparse
 from src.data_loader import load_csv, train_test_split_time_series
-from src.features import (
-    add_technical_indicators,
-    add_temporal_features,
-    add_lagged_features,
-    add_return_features,
-    add_custom_features,
-)
+from src.features import prepare_training_data
 from src.trainer import ModelTrainer
 from src.predictor import ModelPredictor
+from src.profiler import SamplingProfiler
+from src.config import PROFILES_PATH, TARGET_HORIZONS, TRAINING_MODEL_PARAMS
 
 # Configuration
 CSV_PATH = "data/gold_data_last_90.csv"
-TARGET_HORIZONS = [1, 2, 3]
-FEATURE_COLUMNS = ['open', 'high', 'low', 'close']
-LAGS = [1, 2, 3]
-MODEL_PARAMS = {"n_estimators": 100, "max_depth": 3, "verbosity": 0}
-
-
-def prepare_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = add_technical_indicators(df)
-    df = add_temporal_features(df)
-    df = add_lagged_features(df, columns=FEATURE_COLUMNS, lags=LAGS)
-    df = add_return_features(df)
-    df = add_custom_features(df)
-    return df
-
-
-def create_targets(df: pd.DataFrame, horizons: list) -> pd.DataFrame:
-    for h in horizons:
-        df[f"close_t+{h}"] = df["close"].shift(-h)
-    return df
 
 
 def main():
     # 1. Load and prepare data
     df = load_csv(CSV_PATH)
-    df = prepare_features(df)
-    df = create_targets(df, TARGET_HORIZONS)
-    df.dropna(inplace=True)
+    df = prepare_training_data(df, TARGET_HORIZONS)
 
     # 2. Split features and targets
     target_cols = [f"close_t+{h}" for h in TARGET_HORIZONS if f"close_t+{h}" in df.columns]
@@ -50,7 +25,7 @@ def main():
     y_train, y_val = train_test_split_time_series(y)
 
     # 4. Train
-    trainer = ModelTrainer(target_horizons=TARGET_HORIZONS, model_params=MODEL_PARAMS)
+    trainer = ModelTrainer(target_horizons=TARGET_HORIZONS, model_params=TRAINING_MODEL_PARAMS)
     trainer.train(X_train, y_train)
     trainer.save_models()
     metrics = trainer.evaluate(X_val, y_val)
@@ -64,5 +39,20 @@ def main():
     print("📈 Next predictions:", predictions)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train and evaluate the OHLC prediction models.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Sample the run and write a collapsed-stack (flamegraph) profile")
+    parser.add_argument("--profile-dir", default=PROFILES_PATH,
+                        help="Directory for profile output")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.profile:
+        with SamplingProfiler("main", output_dir=args.profile_dir) as profiler:
+            main()
+        print("🔥 Profile written to:", profiler.output_path)
+    else:
+        main()
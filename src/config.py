@@ -15,6 +15,7 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(ROOT_DIR, 'data')
 MODELS_PATH = os.path.join(ROOT_DIR, 'models')
 NOTEBOOKS_PATH = os.path.join(ROOT_DIR, 'notebooks')
+PROFILES_PATH = os.path.join(ROOT_DIR, 'profiles')  # Created on first profile
 
 # Ensure directories exist
 os.makedirs(DATA_PATH, exist_ok=True)
@@ -55,6 +56,8 @@ DEFAULT_LAG_PERIODS = [1, 2, 3, 5, 10]
 
 # Model configuration
 DEFAULT_MODEL_TYPE = 'xgboost'
+MODEL_MANIFEST = 'current.json'  # Points at the versioned directory of the served model set
+MODEL_VERSIONS_KEPT = 3  # Saved model sets kept on disk for workers still loading an older one
 
 # Default model parameters for each model type
 MODEL_PARAMS = {
@@ -86,11 +89,32 @@ MODEL_PARAMS = {
     }
 }
 
+# Training pipeline shared by main.py, api.py and the background retrainer
+TARGET_HORIZONS = [1, 2, 3]  # Candles ahead, one model per horizon
+FEATURE_COLUMNS = ['open', 'high', 'low', 'close']  # Columns given lagged copies
+LAGS = [1, 2, 3]
+TRAINING_MODEL_PARAMS = {"n_estimators": 100, "max_depth": 3, "verbosity": 0}
+
 # Training configuration
 TRAIN_TEST_SPLIT_RATIO = 0.2
 VALIDATION_SPLIT_RATIO = 0.1
 RANDOM_SEED = 42
 
+# Background retraining configuration
+RETRAIN_POLL_INTERVAL = 60.0  # Seconds between checks for new candles
+RETRAIN_MIN_NEW_ROWS = 1  # New candles needed to trigger a warm-start update
+RETRAIN_WINDOW_SIZE = 500  # Recent rows used for warm-start boosting
+RETRAIN_WARM_ROUNDS = 10  # Trees added per horizon on each warm-start update
+RETRAIN_MAX_TREES = 300  # Trees per booster beyond which a full rebuild replaces warm updates
+RETRAIN_HOLDOUT_SIZE = 50  # Most recent rows kept out of training for validation
+RETRAIN_FULL_REBUILD_INTERVAL = 24 * 3600.0  # Seconds between from-scratch rebuilds
+RETRAIN_TOLERANCE = 0.0  # Allowed relative MAE increase before a candidate is rejected
+RETRAIN_CAP_TOLERANCE = 0.05  # Same, for the rebuild that replaces boosters at the tree cap
+
+# Shared-memory feature serving configuration
+SHARED_FEATURES_NAME = 'quantia_features'  # Shared memory name used by publisher and workers
+SHARED_FEATURES_POLL_INTERVAL = 5.0  # Seconds between checks of the CSV by the publisher
+
 # Prediction configuration
 PREDICTION_HORIZON = 1  # Number of candles to predict ahead
 
@@ -102,6 +126,11 @@ API_HOST = '0.0.0.0'
 API_PORT = 8000
 API_DEBUG = False
 
+# Profiling configuration
+PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+PROFILE_MIN_INTERVAL = 60.0  # Minimum seconds between two profiles per process
+PROFILE_MAX_FILES = 20  # Most recent profiles kept in PROFILES_PATH, older ones are deleted
+
 
 def get_model_params(model_type: str) -> Dict[str, Any]:
     """
@@ -1,16 +1,243 @@
 # src/data_loader.py
 
+import logging
+import numpy as np
 import pandas as pd
-from typing import Tuple
+from typing import Dict, Optional, Tuple, Union
 
-def load_csv(filepath: str) -> pd.DataFrame:
+logger = logging.getLogger(__name__)
+
+OHLC = ['open', 'high', 'low', 'close']
+
+DUPLICATE_POLICIES = ('keep_last', 'keep_first', 'report')
+ORDER_POLICIES = ('sort', 'report')
+OHLC_POLICIES = ('clip', 'drop', 'report')
+GAP_POLICIES = ('ffill', 'report')
+
+# Report entries that indicate a corrupt feed (gaps alone are expected around market closures)
+DATA_ISSUES = ('nat_dates', 'out_of_order', 'duplicates', 'invalid_ohlc', 'bad_prices')
+_NAT = np.iinfo(np.int64).min  # NaT viewed as int64
+
+
+def load_csv(
+    filepath: str,
+    validate: bool = True,
+    duplicates: str = 'keep_last',
+    order: str = 'sort',
+    ohlc: str = 'report',
+    gaps: str = 'report',
+    freq: Optional[Union[str, pd.Timedelta]] = None,
+) -> pd.DataFrame:
     """
     Load raw OHLC CSV data.
+
+    With `validate`, the frame goes through `validate_ohlc` (see there for the policies)
+    and the summary is stored in `df.attrs['validation']`.
     """
     df = pd.read_csv(filepath, parse_dates=['date'])
-    df.sort_values('date', inplace=True)
+    if not validate:
+        df.sort_values('date', inplace=True)
+        return df
+
+    if not pd.api.types.is_datetime64_any_dtype(df['date']):
+        # read_csv leaves the column as text if any cell is unparseable: those become NaT
+        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    df, report = validate_ohlc(df, duplicates=duplicates, order=order, ohlc=ohlc, gaps=gaps, freq=freq)
+    df.attrs['validation'] = report
+    issues = {k: report[k] for k in DATA_ISSUES if report[k]}
+    if issues:
+        logger.warning("Data issues in %s: %s", filepath, issues)
+    gap_stats = {k: report[k] for k in ('gaps', 'missing_bars', 'rows_inserted') if report[k]}
+    if gap_stats:
+        # Market closures (weekends, holidays) show up as gaps on every load: not worth a warning
+        logger.debug("Gaps in %s at %s: %s", filepath, report['freq'], gap_stats)
     return df
 
+
+def validate_ohlc(
+    df: pd.DataFrame,
+    duplicates: str = 'keep_last',
+    order: str = 'sort',
+    ohlc: str = 'report',
+    gaps: str = 'report',
+    freq: Optional[Union[str, pd.Timedelta]] = None,
+) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Detect and repair common feed problems with vectorized NumPy passes.
+
+    Args:
+        df: Raw OHLC DataFrame with a datetime 'date' column
+        duplicates: Rows sharing a timestamp: 'keep_last', 'keep_first' or 'report'
+        order: Non-monotonic timestamps: 'sort' (stable) or 'report'
+        ohlc: Rows with high < low or open/close outside [low, high]: 'clip' (rebuild high
+            and low from the four prices), 'drop' (also drops NaN/non-positive prices) or 'report'
+        gaps: Missing bars: 'ffill' (insert flat candles at the previous close) or 'report'.
+            Market closures (e.g. weekends on daily data) also show up as gaps.
+        freq: Expected bar interval; inferred as the (lower) median timestamp step if None
+
+    Rows whose date is missing or unparseable (NaT) cannot be placed in time and are always dropped.
+
+    Returns:
+        The repaired DataFrame (with a fresh RangeIndex) and a summary dictionary.
+    """
+    for name, value, allowed in (
+        ('duplicates', duplicates, DUPLICATE_POLICIES),
+        ('order', order, ORDER_POLICIES),
+        ('ohlc', ohlc, OHLC_POLICIES),
+        ('gaps', gaps, GAP_POLICIES),
+    ):
+        if value not in allowed:
+            raise ValueError(f"Unsupported {name} policy: {value} (expected one of {allowed})")
+    if gaps == 'ffill' and (order != 'sort' or duplicates == 'report'):
+        raise ValueError("gaps='ffill' requires order='sort' and duplicates to be removed")
+
+    report = {'rows_in': len(df)}
+    ts = df['date'].to_numpy(dtype='datetime64[ns]').view('i8')  # UTC if tz-aware
+    rows = None  # Positions of the output rows in `df`; None while it is the identity
+
+    # 0. Missing dates, dropped before they skew ordering and gap arithmetic
+    nat = ts == _NAT
+    report['nat_dates'] = int(np.count_nonzero(nat))
+    dated = np.flatnonzero(~nat) if report['nat_dates'] else None
+    if dated is not None:
+        ts = ts[dated]
+
+    # 1. Ordering: only pay for a sort when the timestamps are actually out of order
+    steps = np.diff(ts)
+    report['out_of_order'] = int(np.count_nonzero(steps < 0))
+    if report['out_of_order']:
+        perm = np.argsort(ts, kind='stable')
+        steps = np.diff(ts[perm])
+    else:
+        perm = None
+
+    # 2. Duplicates are adjacent once sorted; within a run the stable sort keeps file order
+    same = steps == 0
+    report['duplicates'] = int(np.count_nonzero(same))
+    if duplicates == 'keep_last':
+        keep = np.append(~same, True)
+    elif duplicates == 'keep_first':
+        keep = np.insert(~same, 0, True)
+    else:
+        keep = None
+
+    if perm is not None and order == 'sort':
+        rows = perm if keep is None else perm[keep]
+    elif perm is not None and keep is not None:
+        keep_original = np.empty_like(keep)
+        keep_original[perm] = keep
+        rows = np.flatnonzero(keep_original)
+    elif keep is not None and report['duplicates']:
+        rows = np.flatnonzero(keep)
+    if rows is not None:
+        ts = ts[rows]
+    if dated is not None:
+        rows = dated if rows is None else dated[rows]
+
+    # 3. OHLC consistency, on the four price columns only
+    o, h, l, c = (_take(df[col].to_numpy(dtype=np.float64), rows) for col in OHLC)
+    body_high = np.maximum(o, c)
+    body_low = np.minimum(o, c)
+    invalid = (h < body_high) | (l > body_low)  # Together these also cover high < low
+    bad_prices = np.isnan(o + h + l + c) | (l <= 0) | (body_low <= 0)
+    report['invalid_ohlc'] = int(np.count_nonzero(invalid))
+    report['bad_prices'] = int(np.count_nonzero(bad_prices))
+    prices_changed = False
+    if ohlc == 'clip' and report['invalid_ohlc']:
+        h, l = (np.where(invalid, np.fmax(h, np.fmax(body_high, l)), h),
+                np.where(invalid, np.fmin(l, np.fmin(body_low, h)), l))
+        prices_changed = True
+    elif ohlc == 'drop' and (report['invalid_ohlc'] or report['bad_prices']):
+        good = ~(invalid | bad_prices)
+        rows = np.flatnonzero(good) if rows is None else rows[good]
+        ts, o, h, l, c = ts[good], o[good], h[good], l[good], c[good]
+
+    # 4. Missing bars, measured on the cleaned timestamps
+    report['gaps'] = report['missing_bars'] = report['rows_inserted'] = 0
+    report['freq'] = None
+    grid = None
+    steps = np.diff(ts if perm is None or order == 'sort' else np.sort(ts))
+    positive = steps[steps > 0]
+    if len(positive):
+        if freq is not None:
+            step = int(pd.Timedelta(freq).value)
+        else:
+            # A strided sample is enough to find the bar interval and avoids a full selection.
+            # Lower median, so the interval is a step that occurs in the data (no 1m30s from 1m/2m)
+            sample = positive[::max(1, len(positive) // 100_000)]
+            mid = (len(sample) - 1) // 2
+            step = int(np.partition(sample, mid)[mid])
+        report['freq'] = str(pd.Timedelta(step, unit='ns'))
+        missing = positive // step - 1
+        report['gaps'] = int(np.count_nonzero(missing > 0))
+        report['missing_bars'] = int(missing[missing > 0].sum())
+
+        if gaps == 'ffill' and report['missing_bars']:
+            offsets = ts - ts[0]
+            if np.any(offsets % step):
+                logger.warning("Timestamps are not aligned on a %s grid, gaps left unfilled", report['freq'])
+            else:
+                source, inserted = _fill_missing_bars(offsets // step)
+                rows = source if rows is None else rows[source]
+                # Inserted bars are flat candles at the previous close
+                c = c[source]
+                o, h, l = (np.where(inserted, c, x[source]) for x in (o, h, l))
+                grid = ts[0] + np.arange(len(source), dtype=np.int64) * step
+                report['rows_inserted'] = report['missing_bars']
+
+    # Single take of the whole frame, then write back the repaired columns
+    if rows is not None:
+        df = df.take(rows)
+    df = df.reset_index(drop=True)
+    if grid is not None:
+        df['date'] = _from_utc_ns(grid, df['date'].dtype)
+        for col, values in zip(OHLC, (o, h, l, c)):
+            df[col] = values
+        if 'volume' in df.columns:
+            df['volume'] = np.where(inserted, 0, df['volume'].to_numpy())
+    elif prices_changed:
+        df['high'] = h
+        df['low'] = l
+
+    report['rows_out'] = len(df)
+    return df, report
+
+
+def _take(values: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+    return values if rows is None else values[rows]
+
+
+def _from_utc_ns(ts: np.ndarray, dtype) -> pd.DatetimeIndex:
+    """
+    Convert int64 UTC nanoseconds back to the date column's dtype (time zone and unit).
+    """
+    dates = pd.DatetimeIndex(ts.view('datetime64[ns]'))
+    tz = getattr(dtype, 'tz', None)
+    if tz is not None:
+        dates = dates.tz_localize('UTC').tz_convert(tz)
+    return dates.astype(dtype)
+
+
+def _fill_missing_bars(slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Map a regular grid onto existing rows.
+
+    Args:
+        slots: Grid position of each row (sorted, unique)
+
+    Returns:
+        For each grid slot, the row to copy (the last real bar at or before it),
+        and a mask of the slots that were missing.
+    """
+    n_slots = int(slots[-1]) + 1
+    source = np.zeros(n_slots, dtype=np.int64)
+    present = np.zeros(n_slots, dtype=bool)
+    source[slots] = np.arange(len(slots))
+    present[slots] = True
+    source = np.maximum.accumulate(source)
+    return source, ~present
+
+
 def train_test_split_time_series(df: pd.DataFrame, test_size: float = 0.2) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Split the dataset into training and test sets while preserving temporal order.
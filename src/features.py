@@ -10,6 +10,8 @@ import numpy as np
 from typing import List, Optional
 import talib
 
+from src.config import FEATURE_COLUMNS, LAGS, TARGET_HORIZONS
+
 
 def add_technical_indicators(df: pd.DataFrame, indicators: Optional[List[str]] = None) -> pd.DataFrame:
     """
@@ -105,6 +107,38 @@ def add_custom_features(df: pd.DataFrame) -> pd.DataFrame:
     return result_df
 
 
+def prepare_features(df: pd.DataFrame, feature_columns: List[str] = FEATURE_COLUMNS,
+                     lags: List[int] = LAGS) -> pd.DataFrame:
+    """
+    Run the full feature pipeline used for both training and serving.
+    """
+    df = add_technical_indicators(df)
+    df = add_temporal_features(df)
+    df = add_lagged_features(df, columns=feature_columns, lags=lags)
+    df = add_return_features(df)
+    df = add_custom_features(df)
+    return df
+
+
+def create_targets(df: pd.DataFrame, horizons: List[int] = TARGET_HORIZONS) -> pd.DataFrame:
+    """
+    Add the `close_t+{h}` target columns (close price `h` candles ahead).
+    """
+    for h in horizons:
+        df[f"close_t+{h}"] = df["close"].shift(-h)
+    return df
+
+
+def prepare_training_data(df: pd.DataFrame, horizons: List[int] = TARGET_HORIZONS,
+                          feature_columns: List[str] = FEATURE_COLUMNS, lags: List[int] = LAGS) -> pd.DataFrame:
+    """
+    Build features and targets, dropping rows where any of them is missing.
+    """
+    df = prepare_features(df, feature_columns=feature_columns, lags=lags)
+    df = create_targets(df, horizons)
+    return df.dropna()
+
+
 def select_features(df: pd.DataFrame, feature_list: Optional[List[str]] = None) -> pd.DataFrame:
     """
     Select specific features from the DataFrame.
@@ -1,8 +1,25 @@
+import json
 import os
 import xgboost as xgb
 import pandas as pd
 from typing import List, Dict
 
+from src.config import MODEL_MANIFEST
+
+
+def resolve_model_dir(model_dir: str) -> str:
+    """
+    Return the directory holding the current model set.
+
+    `ModelTrainer.save_models` writes each set to its own versioned directory and then
+    points the manifest at it. Without a manifest, models are read from `model_dir` itself.
+    """
+    try:
+        with open(os.path.join(model_dir, MODEL_MANIFEST)) as f:
+            return os.path.join(model_dir, json.load(f)["version"])
+    except FileNotFoundError:
+        return model_dir
+
 
 class ModelPredictor:
     def __init__(self, model_dir: str = "models", target_horizons: List[int] = [1, 2, 3]):
@@ -16,15 +33,30 @@ class ModelPredictor:
     def load_models(self):
         """
         Load all models for the defined target horizons.
+
+        The manifest is resolved once, so every horizon comes from the same saved set,
+        even while another process is saving a new one.
         """
+        version_dir = resolve_model_dir(self.model_dir)
+        models = {}
         for horizon in self.target_horizons:
-            model_path = os.path.join(self.model_dir, f"model_t+{horizon}.json")
+            model_path = os.path.join(version_dir, f"model_t+{horizon}.json")
             if os.path.exists(model_path):
                 model = xgb.XGBRegressor()
                 model.load_model(model_path)
-                self.models[f"t+{horizon}"] = model
+                models[f"t+{horizon}"] = model
             else:
                 raise FileNotFoundError(f"Model file not found: {model_path}")
+        self.swap_models(models)
+
+    def swap_models(self, models: Dict[str, xgb.XGBRegressor]):
+        """
+        Replace every horizon's model at once.
+
+        The dictionary is swapped in a single assignment, so a concurrent `predict`
+        sees either the old set or the new one, never a mix of both.
+        """
+        self.models = dict(models)
 
     def predict(self, X: pd.DataFrame) -> Dict[str, float]:
         """
@@ -36,14 +68,15 @@ class ModelPredictor:
         Returns:
             Dictionary with predictions per horizon.
         """
-        if not self.models:
+        models = self.models  # Snapshot in case `swap_models` runs concurrently
+        if not models:
             raise RuntimeError("Models not loaded. Call `load_models()` first.")
 
         if len(X) != 1:
             raise ValueError("Input X must contain exactly one row for prediction.")
 
         predictions = {}
-        for horizon, model in self.models.items():
+        for horizon, model in models.items():
             pred = model.predict(X)[0]
             predictions[f"close_{horizon}"] = pred
 
@@ -0,0 +1,179 @@
+"""
+On-demand profiling for the API and the training pipeline.
+
+A lightweight sampling profiler that periodically captures the Python stack
+of a single thread and writes the result in collapsed-stack format (one
+``frame;frame;frame count`` line per unique stack), ready to be fed to
+flamegraph.pl, speedscope or inferno. A rate limiter guards how often a
+profile may be taken, and only the most recent profiles are kept on disk, so
+the hook can stay enabled in production.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from src.config import PROFILES_PATH, PROFILE_SAMPLE_INTERVAL, PROFILE_MIN_INTERVAL, PROFILE_MAX_FILES
+
+
+class ProfileRateLimiter:
+    def __init__(self, min_interval: float = PROFILE_MIN_INTERVAL):
+        """
+        Allow at most one profile at a time, and at most one every `min_interval` seconds.
+        """
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._running = False
+        self._last_start = float("-inf")
+
+    def acquire(self) -> bool:
+        """
+        Reserve the profiling slot. Returns False if a profile is running or ran too recently.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._running or now - self._last_start < self.min_interval:
+                return False
+            self._running = True
+            self._last_start = now
+            return True
+
+    def release(self):
+        with self._lock:
+            self._running = False
+
+
+class SamplingProfiler:
+    def __init__(
+        self,
+        name: str,
+        output_dir: str = PROFILES_PATH,
+        interval: float = PROFILE_SAMPLE_INTERVAL,
+        thread_id: Optional[int] = None,
+        max_files: Optional[int] = PROFILE_MAX_FILES,
+    ):
+        """
+        Sample the stack of `thread_id` (default: the calling thread) every `interval` seconds.
+
+        After writing, the oldest profiles in `output_dir` beyond `max_files` are deleted
+        (None keeps them all).
+        """
+        self.name = name
+        self.output_dir = output_dir
+        self.interval = interval
+        self.max_files = max_files
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.output_path: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        """
+        Stop sampling and write the collapsed stacks. Returns the output file path.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.output_path = self.write()
+        return self.output_path
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[_collapse(frame)] += 1
+
+    def write(self) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        path = os.path.join(self.output_dir, f"{self.name}_{timestamp}_{os.getpid()}.folded")
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        if self.max_files is not None:
+            _prune(self.output_dir, self.max_files)
+        return path
+
+
+class _NullProfile:
+    output_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _LimitedProfile(SamplingProfiler):
+    def __init__(self, limiter: ProfileRateLimiter, name: str, **kwargs):
+        super().__init__(name, **kwargs)
+        self.limiter = limiter
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            return super().__exit__(exc_type, exc, tb)
+        finally:
+            self.limiter.release()
+
+
+def maybe_profile(limiter: ProfileRateLimiter, name: str, enabled: bool = True, **kwargs):
+    """
+    Return a context manager that profiles its body if `enabled` and the limiter allows it.
+
+    The returned object exposes `output_path`, which is None when no profile was taken.
+    """
+    if not enabled or not limiter.acquire():
+        return _NullProfile()
+    return _LimitedProfile(limiter, name, **kwargs)
+
+
+def _prune(output_dir: str, max_files: int):
+    """
+    Delete the oldest `.folded` files in `output_dir` beyond the `max_files` most recent.
+    """
+    profiles = []
+    for entry in os.scandir(output_dir):
+        if entry.is_file() and entry.name.endswith(".folded"):
+            try:
+                profiles.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                pass  # Pruned concurrently by another worker
+    profiles.sort(reverse=True)
+    for _, path in profiles[max_files:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _collapse(frame) -> str:
+    """
+    Render a frame chain as a root-first, semicolon-separated stack.
+    """
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        labels.append(label.replace(";", ":"))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
@@ -0,0 +1,253 @@
+"""
+Background online retraining for the per-horizon models.
+
+A daemon thread polls the candle CSV. On each batch of new candles it continues
+boosting the current `model_t+{h}` boosters on the recent window (warm start),
+and on a schedule it rebuilds them from scratch on the full history. Candidates
+are scored against a holdout of the most recent rows and only replace the served
+models, atomically and all horizons at once, if no horizon regresses.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.config import (
+    RETRAIN_POLL_INTERVAL,
+    RETRAIN_MIN_NEW_ROWS,
+    RETRAIN_WINDOW_SIZE,
+    RETRAIN_WARM_ROUNDS,
+    RETRAIN_MAX_TREES,
+    RETRAIN_HOLDOUT_SIZE,
+    RETRAIN_FULL_REBUILD_INTERVAL,
+    RETRAIN_TOLERANCE,
+    RETRAIN_CAP_TOLERANCE,
+    FEATURE_COLUMNS,
+    LAGS,
+    TRAINING_MODEL_PARAMS,
+)
+from src.data_loader import load_csv
+from src.features import prepare_training_data
+from src.predictor import ModelPredictor
+from src.trainer import ModelTrainer
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRetrainer:
+    def __init__(
+        self,
+        csv_path: str,
+        predictor: ModelPredictor,
+        feature_columns: List[str] = FEATURE_COLUMNS,
+        lags: List[int] = LAGS,
+        model_params: Optional[Dict] = None,
+        poll_interval: float = RETRAIN_POLL_INTERVAL,
+        min_new_rows: int = RETRAIN_MIN_NEW_ROWS,
+        window_size: int = RETRAIN_WINDOW_SIZE,
+        warm_rounds: int = RETRAIN_WARM_ROUNDS,
+        max_trees: int = RETRAIN_MAX_TREES,
+        holdout_size: int = RETRAIN_HOLDOUT_SIZE,
+        full_rebuild_interval: float = RETRAIN_FULL_REBUILD_INTERVAL,
+        tolerance: float = RETRAIN_TOLERANCE,
+        cap_tolerance: float = RETRAIN_CAP_TOLERANCE,
+    ):
+        """
+        Retrain the models served by `predictor` in the background.
+
+        The predictor's models are swapped in place, so callers holding a reference
+        to it pick up new models on their next `predict` without any locking.
+        Features and hyperparameters default to the ones `main.py` trains with.
+
+        Once a booster reaches `max_trees`, new candles trigger a full rebuild, accepted if it
+        is within `cap_tolerance` of the served models. If it is not, retraining pauses until
+        the next scheduled rebuild rather than rebuilding on every poll.
+        """
+        self.csv_path = csv_path
+        self.predictor = predictor
+        self.feature_columns = feature_columns
+        self.lags = lags
+        self.model_params = model_params if model_params else TRAINING_MODEL_PARAMS
+        self.poll_interval = poll_interval
+        self.min_new_rows = min_new_rows
+        self.window_size = window_size
+        self.warm_rounds = warm_rounds
+        self.max_trees = max_trees
+        self.holdout_size = holdout_size
+        self.full_rebuild_interval = full_rebuild_interval
+        self.tolerance = tolerance
+        self.cap_tolerance = cap_tolerance
+
+        self.last_seen: Optional[pd.Timestamp] = None
+        self.last_full_rebuild = time.monotonic()
+        self._cap_rebuild_rejected = False  # Set until the next scheduled rebuild
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_file = None
+
+    def start(self) -> bool:
+        """
+        Start the worker thread, unless another process already retrains the same model directory.
+
+        Only the process holding `<model_dir>/.retrainer.lock` retrains (e.g. one uvicorn worker
+        out of N); the others keep reading the models it saves. Returns True if this one started.
+        """
+        self._lock_file = _try_lock(os.path.join(self.predictor.model_dir, ".retrainer.lock"))
+        if self._lock_file is None:
+            logger.info("Another process is already retraining %s, not starting", self.predictor.model_dir)
+            return False
+        self._thread = threading.Thread(target=self._run, name="background-retrainer", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._lock_file is not None:
+            self._lock_file.close()  # Releases the lock
+            self._lock_file = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Background retraining step failed")
+            self._stop.wait(self.poll_interval)
+
+    def run_once(self) -> Optional[str]:
+        """
+        Run a single retraining step.
+
+        Returns:
+            "full" or "warm" if a candidate was swapped in, None otherwise.
+        """
+        raw = load_csv(self.csv_path)
+        if raw.empty:
+            return None
+        latest = raw["date"].iloc[-1]
+        new_rows = len(raw) if self.last_seen is None else int((raw["date"] > self.last_seen).sum())
+
+        if not self.predictor.models:
+            try:
+                self.predictor.load_models()
+            except FileNotFoundError:
+                logger.info("No saved models found, building from scratch")
+                self.last_full_rebuild = float("-inf")
+
+        scheduled = time.monotonic() - self.last_full_rebuild >= self.full_rebuild_interval
+        if self.last_seen is None and not scheduled:
+            # First poll: the loaded models are assumed current up to the latest candle
+            self.last_seen = latest
+            return None
+        if not scheduled and new_rows < self.min_new_rows:
+            return None
+        # Past the tree cap, new candles trigger a rebuild instead of growing the boosters
+        capped = not scheduled and self._tree_budget_exhausted()
+        if capped and self._cap_rebuild_rejected:
+            # The capped models stay as they are until the scheduled rebuild
+            self.last_seen = latest
+            return None
+
+        data = prepare_training_data(raw, self.predictor.target_horizons,
+                                     feature_columns=self.feature_columns, lags=self.lags)
+        target_cols = [f"close_t+{h}" for h in self.predictor.target_horizons]
+        X = data.drop(columns=target_cols + ['date'])
+        y = data[target_cols]
+        if len(X) <= self.holdout_size:
+            logger.warning("Not enough rows to retrain (%d <= holdout %d)", len(X), self.holdout_size)
+            return None
+
+        X_train, X_hold = X.iloc[:-self.holdout_size], X.iloc[-self.holdout_size:]
+        y_train, y_hold = y.iloc[:-self.holdout_size], y.iloc[-self.holdout_size:]
+
+        candidate = self._new_trainer()
+        tolerance = self.tolerance
+        if scheduled or capped:
+            kind = "full"
+            candidate.train(X_train, y_train)
+            if scheduled:
+                self.last_full_rebuild = time.monotonic()
+                self._cap_rebuild_rejected = False
+            else:
+                tolerance = self.cap_tolerance
+        else:
+            kind = "warm"
+            candidate.models = dict(self.predictor.models)
+            candidate.update(X_train.iloc[-self.window_size:], y_train.iloc[-self.window_size:],
+                             n_estimators=self.warm_rounds)
+        self.last_seen = latest
+
+        if not self._accept(candidate, X_hold, y_hold, tolerance):
+            logger.info("Rejected %s retraining candidate: holdout MAE regressed", kind)
+            if capped:
+                logger.info("Tree cap reached, no more retraining until the next scheduled rebuild")
+                self._cap_rebuild_rejected = True
+            return None
+        if capped:
+            self.last_full_rebuild = time.monotonic()  # An accepted cap rebuild restarts the schedule
+
+        candidate.save_models()
+        self.predictor.swap_models(candidate.models)
+        logger.info("Swapped in %s retraining candidate", kind)
+        return kind
+
+    def _tree_budget_exhausted(self) -> bool:
+        """
+        True if another warm update would push a booster past `max_trees`.
+
+        Warm updates only add trees, so without this cap boosters, saved files and
+        predict latency would grow until the next scheduled rebuild.
+        """
+        return any(
+            model.get_booster().num_boosted_rounds() + self.warm_rounds > self.max_trees
+            for model in self.predictor.models.values()
+        )
+
+    def _new_trainer(self) -> ModelTrainer:
+        return ModelTrainer(
+            model_dir=self.predictor.model_dir,
+            target_horizons=self.predictor.target_horizons,
+            model_params=self.model_params,
+        )
+
+    def _accept(self, candidate: ModelTrainer, X_hold: pd.DataFrame, y_hold: pd.DataFrame,
+                tolerance: float) -> bool:
+        """
+        Accept the candidate only if no horizon's holdout MAE is worse than the served model's
+        by more than `tolerance` (relative).
+        """
+        if not self.predictor.models:
+            return True
+        baseline = self._new_trainer()
+        baseline.models = dict(self.predictor.models)
+        current = baseline.evaluate(X_hold, y_hold)
+        proposed = candidate.evaluate(X_hold, y_hold)
+        logger.info("Holdout MAE current=%s candidate=%s", current, proposed)
+        return all(proposed[k] <= current[k] * (1 + tolerance) for k in current)
+
+
+def _try_lock(path: str):
+    """
+    Take a non-blocking exclusive lock on `path`. Returns the open file, or None if it is held elsewhere.
+
+    The lock is released when the file is closed or the process exits.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lock_file = open(path, "a+")
+    try:
+        try:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except ImportError:  # Windows
+            import msvcrt
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
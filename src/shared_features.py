@@ -0,0 +1,253 @@
+"""
+Shared-memory feature matrix for multi-worker serving.
+
+A single publisher process computes the feature frame and writes it, as a
+float64 matrix, into a `multiprocessing.shared_memory` segment. Serving
+workers attach read-only and get a zero-copy NumPy view, so memory no longer
+grows with the number of workers.
+
+Layout:
+    - a small control segment `<name>` holding a sequence lock, the version
+      counter and JSON metadata (data segment name, shape, column names);
+    - one immutable data segment `<name>_<version>` per published version.
+
+Data segments are never modified after publication, so a reader that sees a
+consistent control block always gets a consistent matrix. The publisher keeps
+the previous versions alive for a little while so in-flight readers can finish.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import deque
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import SHARED_FEATURES_NAME, SHARED_FEATURES_POLL_INTERVAL
+from src.data_loader import load_csv
+
+logger = logging.getLogger(__name__)
+
+CONTROL_SIZE = 64 * 1024
+_HEADER = struct.Struct("<QQI")  # seq, version, metadata length
+_DTYPE = np.float64
+_READ_ATTEMPTS = 100  # ~10 ms of retries before falling back to the last good matrix
+_RETRY_DELAY = 0.0001
+
+
+def _map_readonly(name: str) -> mmap.mmap:
+    """
+    Map an existing segment read-only.
+
+    The segment is opened directly rather than through `SharedMemory`, so readers never
+    register it with (and never unlink it through) the resource tracker they may share
+    with the publisher. The mapping lives as long as any NumPy view references it.
+    """
+    try:
+        import _posixshmem  # POSIX only, backs multiprocessing.shared_memory
+    except ImportError:
+        raise RuntimeError("Shared-memory features require a POSIX host") from None
+    fd = _posixshmem.shm_open("/" + name, os.O_RDONLY, mode=0o600)
+    try:
+        return mmap.mmap(fd, os.fstat(fd).st_size, prot=mmap.PROT_READ)
+    finally:
+        os.close(fd)
+
+
+class SharedFeaturePublisher:
+    def __init__(self, name: str = SHARED_FEATURES_NAME, keep: int = 2):
+        """
+        Create (or take over) the control segment `name`.
+
+        The control segment outlives the publisher, so a restarted publisher takes it
+        over and keeps incrementing the version that attached readers are watching.
+
+        Args:
+            name: Shared memory name shared with the readers
+            keep: Number of published versions kept alive for in-flight readers
+        """
+        self.name = name
+        self.keep = keep
+        self._segments: deque = deque()
+        try:
+            self._control = SharedMemory(name=name, create=True, size=CONTROL_SIZE)
+            _HEADER.pack_into(self._control.buf, 0, 0, 0, 0)
+        except FileExistsError:
+            self._control = SharedMemory(name=name)
+        # Keep the resource tracker from unlinking the control segment when this process exits
+        resource_tracker.unregister(self._control._name, "shared_memory")
+        self._seq, self.version, _ = _HEADER.unpack_from(self._control.buf, 0)
+        self._seq += self._seq % 2  # Recover from a publisher that died mid-write
+
+    def publish(self, df: pd.DataFrame) -> int:
+        """
+        Publish the numeric columns of `df` as a new version. Returns the new version number.
+        """
+        numeric = df.select_dtypes(include=[np.number])
+        matrix = numeric.to_numpy(dtype=_DTYPE)
+        version = self.version + 1
+        segment_name = f"{self.name}_{version}"
+
+        try:
+            shm = SharedMemory(name=segment_name, create=True, size=max(matrix.nbytes, 1))
+        except FileExistsError:
+            # Left behind by a previous publisher run
+            stale = SharedMemory(name=segment_name)
+            stale.close()
+            stale.unlink()
+            shm = SharedMemory(name=segment_name, create=True, size=max(matrix.nbytes, 1))
+        view = np.ndarray(matrix.shape, dtype=_DTYPE, buffer=shm.buf)
+        view[:] = matrix
+        del view
+
+        meta = json.dumps({
+            "segment": segment_name,
+            "shape": list(matrix.shape),
+            "columns": list(numeric.columns),
+        }).encode()
+        if _HEADER.size + len(meta) > CONTROL_SIZE:
+            raise ValueError(f"Feature metadata too large for control segment ({len(meta)} bytes)")
+
+        # Sequence lock: odd while the control block is being rewritten
+        buf = self._control.buf
+        self._seq += 1
+        struct.pack_into("<Q", buf, 0, self._seq)
+        buf[_HEADER.size:_HEADER.size + len(meta)] = meta
+        struct.pack_into("<QI", buf, 8, version, len(meta))
+        self._seq += 1
+        struct.pack_into("<Q", buf, 0, self._seq)
+        self.version = version
+
+        self._segments.append(shm)
+        while len(self._segments) > self.keep:
+            old = self._segments.popleft()
+            old.close()
+            old.unlink()
+        return version
+
+    def close(self, unlink_control: bool = False):
+        """
+        Unlink the data segments and detach from the control segment.
+
+        Unless `unlink_control`, the control segment is left in place for the next publisher;
+        readers keep serving the matrix they already mapped until a new version is published.
+        """
+        while self._segments:
+            shm = self._segments.popleft()
+            shm.close()
+            shm.unlink()
+        self._control.close()
+        if unlink_control:
+            resource_tracker.register(self._control._name, "shared_memory")  # Balanced by unlink()
+            self._control.unlink()
+
+
+class SharedFeatureReader:
+    def __init__(self, name: str = SHARED_FEATURES_NAME):
+        """
+        Read-only, zero-copy access to the matrix published under `name`.
+        """
+        self.name = name
+        self.version = 0
+        self.columns: List[str] = []
+        self.matrix: Optional[np.ndarray] = None
+        self._control: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def _read_control(self) -> Tuple[Optional[int], Optional[dict]]:
+        """
+        Read the control block under the sequence lock.
+
+        Returns:
+            The version and its metadata (None if the version is unchanged), or (None, None)
+            if the block stayed mid-write, e.g. because the publisher died while writing it.
+        """
+        buf = self._control
+        for _ in range(_READ_ATTEMPTS):
+            seq, version, length = _HEADER.unpack_from(buf, 0)
+            if seq % 2 == 0:
+                if version == self.version:
+                    return version, None
+                meta = bytes(buf[_HEADER.size:_HEADER.size + length])
+                if struct.unpack_from("<Q", buf, 0)[0] == seq:
+                    return version, json.loads(meta)
+            time.sleep(_RETRY_DELAY)
+        return None, None
+
+    def refresh(self) -> bool:
+        """
+        Attach to the latest published version if it changed. Returns True if it did.
+
+        If the control block cannot be read consistently, the last good matrix is kept.
+
+        Raises:
+            FileNotFoundError: If no publisher has created the segments yet.
+        """
+        if self._control is None:
+            with self._lock:
+                if self._control is None:
+                    self._control = _map_readonly(self.name)
+
+        # Spin without holding the lock, so a stuck publisher never serializes request threads
+        for _ in range(_READ_ATTEMPTS):
+            version, meta = self._read_control()
+            if version is None:
+                logger.warning("Shared features '%s' stuck mid-write, serving version %d", self.name, self.version)
+                return False
+            if meta is None:
+                return False
+            try:
+                data = _map_readonly(meta["segment"])
+            except FileNotFoundError:
+                continue  # Superseded and unlinked between the two reads
+            rows, cols = meta["shape"]
+            # Read-only view on the mapping; the previous one is unmapped once no view references it
+            matrix = np.frombuffer(data, dtype=_DTYPE, count=rows * cols).reshape(rows, cols)
+            with self._lock:
+                if version <= self.version:
+                    return False  # Another thread attached this version (or a newer one) first
+                self.matrix = matrix
+                self.columns = meta["columns"]
+                self.version = version
+            return True
+        return False  # Data segment gone (publisher stopped): keep the matrix already mapped
+
+    def latest(self) -> pd.DataFrame:
+        """
+        Return the most recent feature row as a single-row DataFrame, ready for `ModelPredictor.predict`.
+        """
+        self.refresh()
+        with self._lock:
+            columns, matrix = self.columns, self.matrix
+        if matrix is None or len(matrix) == 0:
+            raise RuntimeError("No feature matrix has been published yet.")
+        return pd.DataFrame(matrix[-1:].copy(), columns=columns)
+
+
+def run_publisher(csv_path: str, prepare: Callable[[pd.DataFrame], pd.DataFrame],
+                  name: str = SHARED_FEATURES_NAME, interval: float = SHARED_FEATURES_POLL_INTERVAL):
+    """
+    Reload `csv_path` whenever it changes, run `prepare` on it and publish the result.
+    """
+    publisher = SharedFeaturePublisher(name=name)
+    last_mtime = None
+    try:
+        while True:
+            mtime = os.path.getmtime(csv_path)
+            if mtime != last_mtime:
+                version = publisher.publish(prepare(load_csv(csv_path)))
+                last_mtime = mtime
+                print(f"✅ Published features v{version} to shared memory '{name}'")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.close()
@@ -1,9 +1,16 @@
+import json
 import os
+import shutil
+import tempfile
+import time
 import xgboost as xgb
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional
 
+from src.config import MODEL_MANIFEST, MODEL_VERSIONS_KEPT
+from src.predictor import resolve_model_dir
+
 
 class ModelTrainer:
     def __init__(
@@ -36,6 +43,27 @@ class ModelTrainer:
             else:
                 raise ValueError(f"Unsupported model type: {self.model_type}")
 
+    def update(self, X: pd.DataFrame, y: pd.DataFrame, n_estimators: int):
+        """
+        Continue boosting the current models on new data (warm start).
+
+        Each horizon gets `n_estimators` extra trees on top of its existing booster.
+        The previous models are left untouched, so they can keep serving predictions.
+        """
+        for horizon in self.target_horizons:
+            model = self.models.get(f"t+{horizon}")
+            if model is None:
+                raise RuntimeError(f"No model to update for t+{horizon}. Train or load models first.")
+            y_target = y[f"close_t+{horizon}"]
+
+            if self.model_type == "xgboost":
+                params = {**self.model_params, "n_estimators": n_estimators}
+                updated = xgb.XGBRegressor(**params)
+                updated.fit(X, y_target, xgb_model=model.get_booster())
+                self.models[f"t+{horizon}"] = updated
+            else:
+                raise ValueError(f"Unsupported model type: {self.model_type}")
+
     def evaluate(self, X_val: pd.DataFrame, y_val: pd.DataFrame) -> Dict[str, float]:
         """
         Evaluate each model using MAE metric.
@@ -53,18 +81,54 @@ class ModelTrainer:
     def save_models(self):
         """
         Save trained models to disk.
+
+        All horizons are written to a new versioned directory, then the manifest is
+        atomically replaced to point at it, so readers in any process load either the
+        previous set or the new one, never a mix. Only the most recent
+        `MODEL_VERSIONS_KEPT` sets are kept.
+        """
+        version_dir = tempfile.mkdtemp(dir=self.model_dir, prefix=time.strftime("version_%Y%m%d_%H%M%S_"))
+        try:
+            for horizon, model in self.models.items():
+                save_path = os.path.join(version_dir, f"model_{horizon}.json")  # ✅ correct
+                model.save_model(save_path)
+                print(f"✅ Model for {horizon} saved to: {save_path}")
+
+            manifest = json.dumps({"version": os.path.basename(version_dir)})
+            fd, tmp_path = tempfile.mkstemp(dir=self.model_dir, prefix=".tmp_manifest_")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(manifest)
+                os.replace(tmp_path, os.path.join(self.model_dir, MODEL_MANIFEST))
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except BaseException:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+        self._prune_versions()
+
+    def _prune_versions(self):
+        """
+        Delete the oldest saved model sets beyond `MODEL_VERSIONS_KEPT`, never the current one.
         """
-        for horizon, model in self.models.items():
-            save_path = os.path.join(self.model_dir, f"model_{horizon}.json")  # ✅ correct
-            model.save_model(save_path)
-            print(f"✅ Model for {horizon} saved to: {save_path}")
+        current = resolve_model_dir(self.model_dir)
+        versions = sorted(
+            (entry.stat().st_mtime, entry.path)
+            for entry in os.scandir(self.model_dir)
+            if entry.is_dir() and entry.name.startswith("version_")
+        )
+        for _, path in versions[:-MODEL_VERSIONS_KEPT]:
+            if path != current:
+                shutil.rmtree(path, ignore_errors=True)
 
     def load_models(self):
         """
         Load all models for the defined target horizons.
         """
+        version_dir = resolve_model_dir(self.model_dir)
         for horizon in self.target_horizons:
-            model_path = os.path.join(self.model_dir, f"model_{horizon}.json")  # ✅ match trainer
+            model_path = os.path.join(version_dir, f"model_{horizon}.json")  # ✅ match trainer
             if os.path.exists(model_path):
                 model = xgb.XGBRegressor()
                 model.load_model(model_path)